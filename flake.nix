@@ -44,6 +44,10 @@
             inherit pkgs;
           };
 
+          mkBuildMatrix = import ./lib/mkBuildMatrix {
+            inherit pkgs;
+          };
+
           # Re-exported from west-nix for convenience
           mkWestProjects = west-nix.lib.${system}.mkWestProjects;
           mkWestWorkspace = west-nix.lib.${system}.mkWestWorkspace;
@@ -54,6 +58,12 @@
             inherit pkgs;
             west-nix-lib = west-nix.lib.${system};
           };
+
+          # Sandboxed firmware build for one app/board pair
+          mkZephyrApp = import ./lib/mkZephyrApp.nix {
+            inherit pkgs;
+            west-nix-lib = west-nix.lib.${system};
+          };
         };
 
         # Development shell for working on zephyr-nix itself
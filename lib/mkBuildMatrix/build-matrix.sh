@@ -0,0 +1,197 @@
+set -euo pipefail
+
+# zephyr-build-matrix - Build many app/board targets under one job budget
+# Usage: zephyr-build-matrix [OPTIONS] [APP:BOARD...]
+#
+# Options:
+#   -j, --jobs N         Global job budget shared by all targets (default: nproc)
+#   --targets FILE       Read APP:BOARD targets from FILE, one per line
+#   --build-root DIR     Parent directory for build dirs (default: <workspaceRoot>/build-matrix)
+#   --help               Show this help message
+#
+# Arguments:
+#   APP:BOARD            Application directory and board, e.g. app:nrf52840dk/nrf52840
+#
+# All targets run concurrently under a single GNU make jobserver, so the
+# Ninja instances started by each `west build` share one pool of N jobs
+# instead of each assuming every core is theirs. Repeated targets are built
+# once. Build dirs are named after the app path relative to the current
+# directory and the board, e.g. samples_blinky@nrf52840dk_nrf52840.
+
+JOBS="$(nproc)"
+BUILD_ROOT="$workspaceRoot/build-matrix"
+TARGETS=()
+BUILD_DIRS=()
+
+# Internal: build a single target as a jobserver client
+if [ "${1:-}" = "--run-target" ]; then
+  APP="$2"
+  BOARD="$3"
+  BUILD_DIR="$4"
+  LABEL="$5"
+
+  mkdir -p "$BUILD_DIR"
+  export CCACHE_STATSLOG="$BUILD_DIR/ccache-stats.log"
+  rm -f "$CCACHE_STATSLOG"
+
+  start=$(date +%s%N)
+  # No -j here: Ninja takes its slots from the jobserver in MAKEFLAGS
+  if west build --board "$BOARD" --build-dir "$BUILD_DIR" "$APP" > "$BUILD_DIR/build.log" 2>&1; then
+    status="ok"
+  else
+    status="FAILED"
+  fi
+  end=$(date +%s%N)
+
+  stats=$(ccache --show-log-stats 2>/dev/null || true)
+  hits=$(awk '$1 == "Hits:" { print $2; exit }' <<< "$stats")
+  misses=$(awk '$1 == "Misses:" { print $2; exit }' <<< "$stats")
+
+  printf '%s\t%s\t%s\t%s\t%s\t%s\n' \
+    "$LABEL" "$BOARD" "$status" "$(( (end - start) / 1000000 ))" "${hits:-0}" "${misses:-0}" \
+    > "$BUILD_DIR/summary.tsv"
+  echo "[$status] $APP:$BOARD" >&2
+
+  if [ "$status" = "ok" ]; then
+    exit 0
+  fi
+  exit 1
+fi
+
+# Parse arguments
+while [[ $# -gt 0 ]]; do
+  case $1 in
+    -j|--jobs)
+      JOBS="$2"
+      shift 2
+      ;;
+    --targets)
+      while read -r line || [ -n "$line" ]; do
+        line="${line%%#*}"
+        line="${line#"${line%%[![:space:]]*}"}"
+        line="${line%"${line##*[![:space:]]}"}"
+        if [ -n "$line" ]; then
+          TARGETS+=("$line")
+        fi
+      done < "$2"
+      shift 2
+      ;;
+    --build-root)
+      BUILD_ROOT="$2"
+      shift 2
+      ;;
+    --help)
+      sed -n '/^# zephyr-build-matrix -/,/^$/p' "$0" | sed 's/^# \{0,1\}//'
+      exit 0
+      ;;
+    -*)
+      echo "Error: Unknown option: $1" >&2
+      echo "Run 'zephyr-build-matrix --help' for usage information" >&2
+      exit 1
+      ;;
+    *)
+      TARGETS+=("$1")
+      shift
+      ;;
+  esac
+done
+
+if [ ${#TARGETS[@]} -eq 0 ]; then
+  echo "Error: No targets specified" >&2
+  echo "Run 'zephyr-build-matrix --help' for usage information" >&2
+  exit 1
+fi
+
+if ! command -v west > /dev/null; then
+  echo "Error: west not found; run zephyr-build-matrix from the Zephyr devShell" >&2
+  exit 1
+fi
+
+# Share the workspace ccache between all targets
+if [ -z "${CCACHE_DIR:-}" ]; then
+  # shellcheck disable=SC1091
+  source "$ccacheSetup/bin/cross-ccache-setup"
+fi
+
+BUILD_ROOT="$(realpath -m "$BUILD_ROOT")"
+mkdir -p "$BUILD_ROOT"
+
+# Resolve targets to unique build dirs; concurrent builds must never share one
+declare -A DIR_TARGETS=()
+APPS=()
+BOARDS=()
+LABELS=()
+for target in "${TARGETS[@]}"; do
+  if [[ "$target" != *:* ]]; then
+    echo "Error: Invalid target '$target', expected APP:BOARD" >&2
+    exit 1
+  fi
+  app="$(realpath "${target%%:*}")"
+  board="${target#*:}"
+  label="$(realpath --relative-to="$PWD" "$app")"
+  if [ "$label" = "." ] || [ "$label" = ".." ] || [[ "$label" == ../* ]]; then
+    label="$app"
+  fi
+  app_dir="${label#/}"
+  build_dir="$BUILD_ROOT/${app_dir//\//_}@${board//\//_}"
+
+  if [ -n "${DIR_TARGETS[$build_dir]:-}" ]; then
+    if [ "${DIR_TARGETS[$build_dir]}" = "$app:$board" ]; then
+      continue
+    fi
+    echo "Error: Targets '${DIR_TARGETS[$build_dir]}' and '$app:$board' map to the same build dir $build_dir" >&2
+    exit 1
+  fi
+  DIR_TARGETS[$build_dir]="$app:$board"
+
+  rm -f "$build_dir/summary.tsv"
+  BUILD_DIRS+=("$build_dir")
+  APPS+=("$app")
+  BOARDS+=("$board")
+  LABELS+=("$label")
+done
+
+# Generate one make target per APP:BOARD; "+" hands the jobserver to west/Ninja
+MAKEFILE="$BUILD_ROOT/Makefile"
+{
+  echo ".PHONY: all"
+  printf 'all:'
+  for i in "${!BUILD_DIRS[@]}"; do
+    printf ' target-%s' "$i"
+  done
+  echo
+
+  for i in "${!BUILD_DIRS[@]}"; do
+    echo ".PHONY: target-$i"
+    echo "target-$i:"
+    printf '\t+@%q --run-target %q %q %q %q\n' \
+      "$0" "${APPS[$i]}" "${BOARDS[$i]}" "${BUILD_DIRS[$i]}" "${LABELS[$i]}" | sed 's/\$/$$/g'
+  done
+} > "$MAKEFILE"
+
+echo "Building ${#BUILD_DIRS[@]} targets with a shared budget of $JOBS jobs..." >&2
+start=$(date +%s%N)
+make_status=0
+make --no-print-directory --keep-going --jobserver-style=fifo -j "$JOBS" -f "$MAKEFILE" all || make_status=$?
+end=$(date +%s%N)
+
+# Per-target summary
+echo
+for build_dir in "${BUILD_DIRS[@]}"; do
+  cat "$build_dir/summary.tsv" 2>/dev/null || true
+done | sort | awk -F '\t' \
+  -v wall="$(( (end - start) / 1000000 ))" -v jobs="$JOBS" '
+  BEGIN {
+    printf "%-40s %-8s %10s %8s %8s\n", "TARGET", "STATUS", "TIME (s)", "HITS", "MISSES"
+  }
+  {
+    printf "%-40s %-8s %10.1f %8d %8d\n", $1 ":" $2, $3, $4 / 1000, $5, $6
+    total += $4; hits += $5; misses += $6
+  }
+  END {
+    printf "%-40s %-8s %10.1f %8d %8d\n", "TOTAL (sum of targets)", "", total / 1000, hits, misses
+    printf "Wall clock: %.1f s (%.1fx speedup on %d jobs)\n", wall / 1000, (wall > 0 ? total / wall : 0), jobs
+  }'
+echo "Build logs: $BUILD_ROOT/<target>/build.log"
+
+exit "$make_status"
@@ -0,0 +1,24 @@
+{ pkgs }:
+
+{ workspaceRoot
+, ccacheSetup
+}:
+
+pkgs.writeShellApplication {
+  name = "zephyr-build-matrix";
+
+  runtimeInputs = [
+    pkgs.gnumake  # Top-level jobserver (fifo style, GNU make >= 4.4)
+    pkgs.ninja  # Jobserver client (ninja >= 1.13)
+    pkgs.gawk
+    pkgs.coreutils
+    pkgs.gnused
+    ccacheSetup
+  ];
+
+  text = ''
+    workspaceRoot="${workspaceRoot}"
+    ccacheSetup="${ccacheSetup}"
+    ${builtins.readFile ./build-matrix.sh}
+  '';
+}
@@ -2,17 +2,145 @@
 
 { workspaceRoot # TODO: this should be absolute path
 , maxSize
+, enable ? true
 }:
 
 pkgs.symlinkJoin {
   name = "cross-ccache";
   paths = [
     pkgs.ccache
-    (pkgs.writeShellScriptBin "cross-ccache-setup" ''
+    (pkgs.writeShellScriptBin "cross-ccache-setup" (''
       export CCACHE_DIR="$PWD/${workspaceRoot}/.ccache"
       export CCACHE_MAXSIZE="${maxSize}"
       export CCACHE_IGNOREOPTIONS="-specs=* --specs=*"
       mkdir -p "$CCACHE_DIR"
-    '')
+    '' + pkgs.lib.optionalString (!enable) ''
+      # ccache stays on PATH but passes compiles straight through
+      export CCACHE_DISABLE=1
+    ''))
+    # CMake integration: Zephyr's cmake/modules/ccache.cmake sets ccache as
+    # RULE_LAUNCH_COMPILE/RULE_LAUNCH_LINK when it finds ccache on PATH and
+    # USE_CCACHE is not 0. This package puts ccache on PATH and
+    # cross-ccache-check verifies the launcher and existing build dirs. A
+    # CCACHE_DISABLE set by the developer is left alone.
+    (pkgs.writeShellApplication {
+      name = "cross-ccache-check";
+      runtimeInputs = [ pkgs.ccache pkgs.gawk pkgs.cmake pkgs.ninja pkgs.findutils pkgs.gnugrep pkgs.coreutils ];
+      text = ''
+        # Usage: cross-ccache-check [--force] [COMPILER]
+        # Verifies that Zephyr builds go through ccache:
+        # 1. Configures a tiny CMake project with an SDK compiler (default:
+        #    arm-zephyr-eabi-gcc) and Zephyr's own cmake/modules/ccache.cmake,
+        #    checks that it sets ccache as the compile launcher, then builds
+        #    it twice and checks that the second build was a cache hit.
+        # 2. Reports existing Zephyr build dirs below $PWD that were
+        #    configured without a ccache launcher, e.g. with -DUSE_CCACHE=0.
+        # A passing check is recorded in the workspace and only rerun when the
+        # compiler, ZEPHYR_BASE, ccache.cmake or ccache version changes, so
+        # shell entry stays fast. --force runs it regardless.
+
+        # RULE_LAUNCH_COMPILE lands in rules.ninja, compiler launchers in build.ninja
+        uses_ccache() {
+          grep -Eqs 'command = ([^ ]*/)?ccache |LAUNCHER = ([^ ]*/)?ccache' \
+            "$1/build.ninja" "$1/CMakeFiles/rules.ninja"
+        }
+
+        force=false
+        if [ "''${1:-}" = "--force" ]; then
+          force=true
+          shift
+        fi
+
+        compiler="''${1:-}"
+        if [ -z "$compiler" ]; then
+          sdk="''${ZEPHYR_SDK_INSTALL_DIR:-}"
+          for candidate in "$sdk"/arm-zephyr-eabi/bin/arm-zephyr-eabi-gcc "$sdk"/*/bin/*-zephyr-*-gcc; do
+            if [ -x "$candidate" ]; then
+              compiler="$candidate"
+              break
+            fi
+          done
+        fi
+
+        if [ -n "''${CCACHE_DISABLE:-}" ]; then
+          echo "ccache: disabled (CCACHE_DISABLE is set)"
+          exit 0
+        fi
+        if [ -z "$compiler" ]; then
+          echo "ccache: skipped check (no SDK toolchain found)"
+          exit 0
+        fi
+        if [ -z "''${CCACHE_DIR:-}" ]; then
+          echo "⚠️  ccache: CCACHE_DIR is not set, source cross-ccache-setup first" >&2
+          exit 1
+        fi
+        if [ -z "''${ZEPHYR_BASE:-}" ] || [ ! -f "$ZEPHYR_BASE/cmake/modules/ccache.cmake" ]; then
+          echo "ccache: skipped check (ZEPHYR_BASE does not point at a Zephyr tree)"
+          exit 0
+        fi
+
+        stamp="$PWD/${workspaceRoot}/.ccache-check-stamp"
+        key="$compiler $ZEPHYR_BASE $(sha256sum "$ZEPHYR_BASE/cmake/modules/ccache.cmake" | cut -d ' ' -f 1) $(ccache --version | head -n 1)"
+        if [ "$force" = false ] && [ "$(cat "$stamp" 2>/dev/null || true)" = "$key" ]; then
+          echo "✓ ccache: $(basename "$compiler") compiles are cached in $CCACHE_DIR (verified earlier, rerun with --force)"
+          exit 0
+        fi
+        rm -f "$stamp"
+
+        status=0
+        tmp=$(mktemp -d)
+        trap 'rm -rf "$tmp"' EXIT
+
+        echo 'int zephyr_nix_ccache_check(void) { return 0; }' > "$tmp/check.c"
+        cat > "$tmp/CMakeLists.txt" <<'EOF'
+        cmake_minimum_required(VERSION 3.20)
+        set(CMAKE_SYSTEM_NAME Generic)
+        set(CMAKE_TRY_COMPILE_TARGET_TYPE STATIC_LIBRARY)
+        project(zephyr_nix_ccache_check C)
+        include($ENV{ZEPHYR_BASE}/cmake/modules/ccache.cmake)
+        add_library(check STATIC check.c)
+        EOF
+
+        export CCACHE_STATSLOG="$tmp/stats.log"
+        if ! cmake -G Ninja -S "$tmp" -B "$tmp/build" -DCMAKE_C_COMPILER="$compiler" > "$tmp/build.log" 2>&1 \
+          || ! ninja -C "$tmp/build" >> "$tmp/build.log" 2>&1 \
+          || ! ninja -C "$tmp/build" -t clean >> "$tmp/build.log" 2>&1 \
+          || ! ninja -C "$tmp/build" >> "$tmp/build.log" 2>&1; then
+          echo "⚠️  ccache: CMake check build with $(basename "$compiler") failed" >&2
+          cat "$tmp/build.log" >&2
+          exit 1
+        fi
+
+        hits=$(ccache --show-log-stats | awk '$1 == "Hits:" { print $2; exit }')
+        if ! uses_ccache "$tmp/build"; then
+          echo "⚠️  ccache: Zephyr's CMake did not set a ccache launcher (is ccache on PATH?)" >&2
+          status=1
+        elif [ "''${hits:-0}" -gt 0 ]; then
+          echo "✓ ccache: $(basename "$compiler") compiles from CMake are cached in $CCACHE_DIR"
+        else
+          echo "⚠️  ccache: $(basename "$compiler") compiles are NOT being cached" >&2
+          ccache --show-log-stats >&2
+          status=1
+        fi
+
+        # Existing build dirs keep the launcher they were configured with
+        while read -r cache; do
+          build_dir=$(dirname "$cache")
+          if ! grep -Eq '^(ZEPHYR_BASE|BOARD)[:=]' "$cache"; then
+            continue
+          fi
+          if [ -f "$build_dir/build.ninja" ] && ! uses_ccache "$build_dir"; then
+            use_ccache=$(grep -m 1 '^USE_CCACHE:' "$cache" || true)
+            echo "⚠️  ccache: $build_dir bypasses ccache''${use_ccache:+ ($use_ccache)}, reconfigure with --pristine" >&2
+            status=1
+          fi
+        done < <(find "$PWD" -maxdepth 4 -name .git -prune -o -name CMakeCache.txt -print)
+
+        if [ "$status" = 0 ]; then
+          echo "$key" > "$stamp"
+        fi
+        exit "$status"
+      '';
+    })
   ];
 }
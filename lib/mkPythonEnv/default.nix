@@ -2,17 +2,39 @@
 
 { workspaceRoot
 , pythonVersion ? "3.12"
+, compileBytecode ? true
 }:
 
-pkgs.writeShellApplication {
+pkgs.symlinkJoin {
   name = "python-env-setup";
+  paths = [
+    (pkgs.writeShellApplication {
+      name = "python-env-setup";
 
-  runtimeInputs = [
-    pkgs.uv
-  ];
+      runtimeInputs = [
+        pkgs.uv
+        pkgs.coreutils
+      ];
+
+      text = ''
+        pythonVersion="${pythonVersion}"
+        compileBytecode="${pkgs.lib.boolToString compileBytecode}"
+        ${builtins.readFile ./setup.sh}
+      '';
+    })
+    (pkgs.writeShellApplication {
+      name = "python-import-profile";
 
-  text = ''
-    pythonVersion="${pythonVersion}"
-    ${builtins.readFile ./setup.sh}
-  '';
+      # Profile the workspace venv, which is what west and CMake run
+      text = ''
+        venv="''${VIRTUAL_ENV:-${toString workspaceRoot}/.venv}"
+        if [ ! -x "$venv/bin/python" ]; then
+          echo "Error: no Python interpreter at $venv/bin/python" >&2
+          echo "Activate the workspace venv or run python-env-setup first" >&2
+          exit 1
+        fi
+        exec "$venv/bin/python" ${./import-profile.py} "$@"
+      '';
+    })
+  ];
 }
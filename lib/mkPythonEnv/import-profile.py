@@ -0,0 +1,119 @@
+"""Report the slowest imports of west and the Zephyr build scripts.
+
+Usage: python-import-profile [--top N] [MODULE...]
+
+Each module is imported in a fresh interpreter with `-X importtime`, the way
+CMake invokes Zephyr's Python scripts, and the slowest imports across all of
+them are listed by self time. Imports done by interpreter start-up (site,
+encodings, .pth files) are profiled once with `-c pass` and left out of the
+module totals and the ranking, since no module can avoid them.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Final, NamedTuple
+
+DEFAULT_MODULES: Final = [
+    "west.app.main",
+    "yaml",
+    "pykwalify.core",
+    "elftools.elf.elffile",
+    "packaging.version",
+]
+
+# Modules imported by the Zephyr build from $ZEPHYR_BASE rather than the venv
+ZEPHYR_MODULES: Final = {
+    "devicetree.edtlib": "scripts/dts/python-devicetree/src",
+    "kconfiglib": "scripts/kconfig",
+}
+
+
+class ImportTime(NamedTuple):
+    """One line of `-X importtime` output."""
+
+    self_us: int
+    cumulative_us: int
+    depth: int
+    name: str
+
+
+def profile(code: str, env: dict[str, str]) -> list[ImportTime] | None:
+    """Run code in a fresh interpreter and parse the import times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=False,
+        env=env,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()
+        print(f"⚠️  Failed to run `{code}`{': ' + error[-1] if error else ''}", file=sys.stderr)
+        return None
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|", 2)
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        times.append(ImportTime(int(self_us), int(cumulative_us), depth, stripped))
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python-import-profile",
+        description="Report the slowest imports of west and the Zephyr build scripts.",
+    )
+    parser.add_argument("modules", nargs="*", metavar="MODULE", help="modules to profile")
+    parser.add_argument("-n", "--top", type=int, default=15, help="number of imports to list")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    modules = args.modules or list(DEFAULT_MODULES)
+
+    zephyr_base = os.environ.get("ZEPHYR_BASE")
+    if zephyr_base:
+        paths = [str(Path(zephyr_base) / path) for path in ZEPHYR_MODULES.values()]
+        env["PYTHONPATH"] = os.pathsep.join(paths + [env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+        if not args.modules:
+            modules += ZEPHYR_MODULES
+    elif not args.modules:
+        print("ZEPHYR_BASE is not set, skipping devicetree and Kconfig modules", file=sys.stderr)
+
+    startup = profile("pass", env)
+    if startup is None:
+        return 1
+    startup_names = {time.name for time in startup}
+    startup_us = sum(time.cumulative_us for time in startup if time.depth == 0)
+
+    slowest: dict[str, ImportTime] = {}
+    print(f"{'MODULE':<40} {'TOTAL (ms)':>12}")
+    print(f"{'(interpreter start-up, excluded)':<40} {startup_us / 1000:>12.1f}")
+    for module in modules:
+        times = profile(f"import {module}", env)
+        if times is None:
+            continue
+        times = [time for time in times if time.name not in startup_names]
+        total_us = sum(time.cumulative_us for time in times if time.depth == 0)
+        print(f"{module:<40} {total_us / 1000:>12.1f}")
+        for time in times:
+            previous = slowest.get(time.name)
+            if previous is None or time.self_us > previous.self_us:
+                slowest[time.name] = time
+
+    ranked = sorted(slowest.values(), key=lambda time: time.self_us, reverse=True)
+    print()
+    print(f"{'IMPORT':<40} {'SELF (ms)':>12} {'CUMULATIVE (ms)':>16}")
+    for time in ranked[: args.top]:
+        print(f"{time.name:<40} {time.self_us / 1000:>12.1f} {time.cumulative_us / 1000:>16.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,25 @@ VENV_DIR="${1:-.}"
 PYLOCK_FILE="${2:-pylock.toml}"
 VENV_PATH="$VENV_DIR/.venv"
 PYTHON_VERSION="$pythonVersion"
+COMPILE_BYTECODE="$compileBytecode"
+
+lock_hash="none"
+if [ -f "$PYLOCK_FILE" ]; then
+  lock_hash=$(sha256sum "$PYLOCK_FILE" | cut -d ' ' -f 1)
+fi
+
+# A venv prebuilt from the same lock (PYTHON_ENV_PREBUILT, set by the
+# mkZephyrEnv image) is linked instead of installed. It is read-only, so a
+# changed lock replaces the link with a fresh venv.
+if [ -L "$VENV_PATH" ] && [ "$(cat "$VENV_PATH/.pylock-sha256" 2>/dev/null || true)" != "$lock_hash" ]; then
+  rm "$VENV_PATH"
+fi
+if [ ! -e "$VENV_PATH" ] && [ -n "${PYTHON_ENV_PREBUILT:-}" ] \
+  && [ "$(cat "$PYTHON_ENV_PREBUILT/.pylock-sha256" 2>/dev/null || true)" = "$lock_hash" ]; then
+  echo "📦 Using prebuilt virtual environment $PYTHON_ENV_PREBUILT"
+  mkdir -p "$VENV_DIR"
+  ln -s "$PYTHON_ENV_PREBUILT" "$VENV_PATH"
+fi
 
 # Create venv if it doesn't exist
 if [ ! -d "$VENV_PATH" ]; then
@@ -16,7 +35,9 @@ if [ ! -d "$VENV_PATH" ]; then
 fi
 
 # Install from pylock.toml if it exists
-if [ -f "$PYLOCK_FILE" ]; then
+if [ -L "$VENV_PATH" ]; then
+  echo "✓ Prebuilt packages match $PYLOCK_FILE"
+elif [ -f "$PYLOCK_FILE" ]; then
   echo "📥 Installing packages from $PYLOCK_FILE..."
   uv pip install --python "$VENV_PATH/bin/python" --requirement "$PYLOCK_FILE"
 else
@@ -24,5 +45,21 @@ else
   echo "   Run 'pylock' after installing packages to generate it"
 fi
 
+# Precompile bytecode with hash-based .pyc files, which stay valid when the
+# environment is copied, made read-only or has its mtimes normalized. Only
+# recompile when the locked packages change, so shell entry stays fast. -f
+# also replaces the timestamp-based .pyc files written by earlier imports.
+if [ "$COMPILE_BYTECODE" = true ]; then
+  BYTECODE_STAMP="$VENV_PATH/.bytecode-stamp"
+  if [ "$(cat "$BYTECODE_STAMP" 2>/dev/null || true)" != "$lock_hash" ]; then
+    echo "⚙️  Compiling bytecode in $VENV_PATH..."
+    site_packages=$("$VENV_PATH/bin/python" -c 'import sysconfig; print(sysconfig.get_paths()["purelib"])')
+    if ! "$VENV_PATH/bin/python" -m compileall -q -f -j 0 --invalidation-mode checked-hash "$site_packages" > /dev/null; then
+      echo "⚠️  Some modules in $site_packages could not be compiled"
+    fi
+    echo "$lock_hash" > "$BYTECODE_STAMP"
+  fi
+fi
+
 echo "✓ Python environment ready at $VENV_PATH"
 echo "  Activate with: source $VENV_PATH/bin/activate"
@@ -0,0 +1,98 @@
+# Build the pylock.toml venv in the sandbox, for images that have to start
+# without a networked install. Every dist is fetched by the URL and sha256
+# pinned in the lock, so nothing is resolved here. Packages that only ship
+# an sdist must build with setuptools.
+{ pkgs }:
+
+{ pylockPath
+, python
+}:
+
+let
+  inherit (pkgs) lib;
+
+  # builtins.fromTOML rejects TOML datetimes, so drop uv's upload-time fields
+  pylock = builtins.fromTOML (lib.concatMapStrings
+    (part:
+      if builtins.isString part then part
+      else if builtins.all (separator: separator != null) part then ", "
+      else "")
+    (builtins.split "(, )?upload-time = [-0-9T:.Z+]+(, )?" (builtins.readFile pylockPath)));
+
+  pythonTag = "cp${builtins.replaceStrings [ "." ] [ "" ] python.pythonVersion}";
+  pythonMinor = lib.toInt python.sourceVersion.minor;
+  arch = pkgs.stdenv.hostPlatform.parsed.cpu.name;
+
+  # Wheel filenames end in -{python tag}-{abi tag}-{platform tag}.whl
+  compatible = url:
+    let
+      parts = lib.splitString "-" (lib.removeSuffix ".whl" (baseNameOf url));
+      tags = field: lib.splitString "." (builtins.elemAt parts (builtins.length parts - field));
+      abi3Minor = tag:
+        let minor = builtins.match "cp3([0-9]+)" tag;
+        in if minor == null then null else lib.toInt (builtins.head minor);
+      pythonOk = builtins.any (tag:
+        tag == "py3" || tag == pythonTag
+        || (builtins.elem "abi3" (tags 2) && abi3Minor tag != null && abi3Minor tag <= pythonMinor)) (tags 3);
+      abiOk = builtins.any (tag: tag == "none" || tag == "abi3" || tag == pythonTag) (tags 2);
+      platformOk = builtins.any (tag: tag == "any" || builtins.match "(many)?linux.*_${arch}" tag != null) (tags 1);
+    in
+    builtins.length parts >= 5 && pythonOk && abiOk && platformOk;
+
+  dist = package:
+    let wheels = builtins.filter (wheel: compatible wheel.url) (package.wheels or [ ]);
+    in if wheels != [ ] then builtins.head wheels else package.sdist or null;
+
+  # Packages behind a marker without a Linux dist are for other platforms
+  packages = builtins.filter (package:
+    if dist package != null then true
+    else if package ? marker then false
+    else throw "${package.name} ${package.version} has no ${pythonTag} ${arch} Linux wheel or sdist in ${toString pylockPath}")
+    pylock.packages;
+
+  fileName = file: builtins.replaceStrings [ "%2B" "%21" ] [ "+" "!" ] (baseNameOf file.url);
+
+  fetchDist = package:
+    let file = dist package;
+    in {
+      name = fileName file;
+      path = pkgs.fetchurl {
+        inherit (file) url;
+        name = lib.strings.sanitizeDerivationName (fileName file);
+        sha256 = file.hashes.sha256;
+      };
+    };
+
+  requirements = builtins.toFile "requirements.txt" (lib.concatMapStrings (package:
+    "${package.name}==${package.version}${lib.optionalString (package ? marker) " ; ${package.marker}"}\n")
+    packages);
+
+  # Build backend for sdists, found through --find-links like the locked dists
+  buildBackends = [ python.pkgs.setuptools.dist python.pkgs.wheel.dist ];
+
+  pylockHash = builtins.hashFile "sha256" pylockPath;
+
+in
+pkgs.runCommand "python-venv" {
+  nativeBuildInputs = [ pkgs.uv ];
+  passthru = { inherit pylockHash; };
+} ''
+  mkdir wheelhouse
+  ${lib.concatMapStrings (file: ''
+    ln -s ${file.path} "wheelhouse/${file.name}"
+  '') (map fetchDist packages)}
+  for backend in ${lib.escapeShellArgs buildBackends}; do
+    ln -s "$backend"/*.whl wheelhouse/
+  done
+
+  export HOME="$TMPDIR" UV_CACHE_DIR="$TMPDIR/uv-cache" UV_PYTHON_DOWNLOADS=never
+  uv venv --python ${python}/bin/python "$out"
+  uv pip install --python "$out/bin/python" --offline --no-index --find-links wheelhouse \
+    --requirement ${requirements}
+
+  # Same bytecode and stamps as python-env-setup, which then skips this venv
+  site_packages=$("$out/bin/python" -c 'import sysconfig; print(sysconfig.get_paths()["purelib"])')
+  "$out/bin/python" -m compileall -q -f -j 0 --invalidation-mode checked-hash "$site_packages" > /dev/null || true
+  echo ${pylockHash} > "$out/.pylock-sha256"
+  echo ${pylockHash} > "$out/.bytecode-stamp"
+''
@@ -0,0 +1,140 @@
+{ pkgs, west-nix-lib }:
+
+let
+  # Shared by every mkZephyrApp call, see mkZephyrEnv.nix
+  zephyrSdk = pkgs.callPackage ../pkgs/zephyr-sdk { };
+  dependencies = import ./mkZephyrDependencies.nix { inherit pkgs; };
+  resolveWestlock = import ./westlock.nix;
+in
+
+{ # Application (REQUIRED)
+  src
+, board
+
+  # SDK configuration (REQUIRED)
+, sdkVersion
+, architectures
+
+  # Lockfile path (users must pass westlockPath = ./westlock.nix or ./westlock.json from their flake,
+  # or an absolute string such as "${inputs.app}/westlock.nix")
+, westlockPath
+, westProjectNames ? null  # Only fetch and check out these west projects
+
+  # Paths relative to src
+, appPath ? "."  # Directory containing the application's CMakeLists.txt
+, manifestPath ? "."  # Path to manifest directory for westinit
+, manifestFile ? "west.yml"  # Name of the manifest file
+
+  # Python environment for the build. The sandbox has no network access, so
+  # this is a Nix-built interpreter rather than the uv-managed workspace venv.
+, pythonEnv ? pkgs.python312.withPackages (ps: with ps; [
+    west
+    pyelftools
+    pyyaml
+    pykwalify
+    packaging
+    jsonschema
+    intelhex
+  ])
+
+  # Build configuration
+, pname ? src.name or "zephyr-app"  # Path sources have no name, pass pname
+, name ? pkgs.lib.strings.sanitizeDerivationName "${pname}-${board}"
+, extraCmakeFlags ? []
+, extraBuildInputs ? []
+, artifacts ? [ "zephyr.elf" "zephyr.hex" "zephyr.bin" ]  # All must be produced
+}:
+
+let
+  # Zephyr SDK - same derivation as mkZephyrEnv for matching arguments
+  sdk = zephyrSdk.override {
+    version = sdkVersion;
+    inherit architectures;
+  };
+
+  # West projects - user must provide westlock.nix or westlock.json as a path
+  westProjects = west-nix-lib.mkWestProjects (resolveWestlock {
+    inherit westlockPath;
+    projectNames = westProjectNames;
+  });
+
+  # West workspace setup script
+  westWorkspaceSetup = west-nix-lib.mkWestWorkspace { inherit westProjects; };
+
+in
+pkgs.stdenv.mkDerivation {
+  inherit name src;
+
+  nativeBuildInputs = [
+    sdk
+    pythonEnv
+    westWorkspaceSetup
+  ]
+    ++ dependencies
+    ++ extraBuildInputs;
+
+  # cmake and ninja setup hooks would otherwise take over the phases
+  dontUseCmakeConfigure = true;
+  dontUseNinjaBuild = true;
+  dontUseNinjaInstall = true;
+  dontUseNinjaCheck = true;
+
+  configurePhase = ''
+    runHook preConfigure
+
+    # Zephyr caches toolchain capabilities under the user cache directory
+    export HOME="$NIX_BUILD_TOP/home"
+    export XDG_CACHE_HOME="$HOME/.cache"
+    mkdir -p "$XDG_CACHE_HOME"
+
+    export ZEPHYR_SDK_INSTALL_DIR="${sdk}"
+    export ZEPHYR_TOOLCHAIN_VARIANT="zephyr"
+    export CMAKE_PREFIX_PATH="${sdk}/cmake:''${CMAKE_PREFIX_PATH:-}"
+
+    westWorkspaceRoot="$NIX_BUILD_TOP/.west-nix"
+    westinit "${manifestPath}" "${manifestFile}" "$westWorkspaceRoot"
+    source "$westWorkspaceRoot/env.sh"
+
+    runHook postConfigure
+  '';
+
+  buildPhase = ''
+    runHook preBuild
+
+    west build \
+      --board "${board}" \
+      --build-dir "$NIX_BUILD_TOP/build" \
+      --build-opt "-j$NIX_BUILD_CORES" \
+      "${appPath}" \
+      -- ${pkgs.lib.escapeShellArgs extraCmakeFlags}
+
+    runHook postBuild
+  '';
+
+  installPhase = ''
+    runHook preInstall
+
+    mkdir -p "$out"
+    for artifact in ${pkgs.lib.escapeShellArgs artifacts}; do
+      if [ ! -f "$NIX_BUILD_TOP/build/zephyr/$artifact" ]; then
+        echo "Error: $artifact was not produced for ${board}" >&2
+        echo "Remove it from artifacts if this board does not generate it" >&2
+        exit 1
+      fi
+      cp "$NIX_BUILD_TOP/build/zephyr/$artifact" "$out/"
+    done
+    cp "$NIX_BUILD_TOP/build/zephyr/.config" "$out/.config"
+
+    runHook postInstall
+  '';
+
+  # Cross-compiled firmware must not be patched or stripped for the host
+  dontFixup = true;
+
+  passthru = {
+    inherit sdk pythonEnv dependencies;
+    inherit westProjects westWorkspaceSetup;
+    inherit pname board sdkVersion architectures artifacts;
+    inherit westlockPath westProjectNames appPath manifestPath manifestFile;
+  };
+}
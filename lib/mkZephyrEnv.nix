@@ -1,5 +1,17 @@
 { pkgs, west-nix-lib }:
 
+let
+  # Everything that depends only on pkgs is evaluated once here and shared
+  # by every mkZephyrEnv call, rather than re-imported per instantiation
+  zephyrSdk = pkgs.callPackage ../pkgs/zephyr-sdk { };
+  dependencies = import ./mkZephyrDependencies.nix { inherit pkgs; };
+  mkPythonEnv = import ./mkPythonEnv { inherit pkgs; };
+  mkPythonVenv = import ./mkPythonEnv/venv.nix { inherit pkgs; };
+  mkCrossCCache = import ./mkCrossCCache.nix { inherit pkgs; };
+  mkBuildMatrix = import ./mkBuildMatrix { inherit pkgs; };
+  resolveWestlock = import ./westlock.nix;
+in
+
 { # SDK configuration (REQUIRED)
   sdkVersion
 , architectures
@@ -13,13 +25,17 @@
 , venvPath ? "${workspaceRoot}/.venv"
 , toolchainPath ? "${workspaceRoot}/.toolchain"
 , ccachePath ? "${workspaceRoot}/.ccache"
+, gcRootsPath ? "${workspaceRoot}/.gcroots"
 
-  # Lockfile paths (users must pass westlockPath = ./westlock.nix from their flake)
+  # Lockfile paths (users must pass westlockPath = ./westlock.nix or ./westlock.json from their flake,
+  # or an absolute string such as "${inputs.app}/westlock.nix")
 , westlockPath
 , pylockPath ? "pylock.toml"
+, westProjectNames ? null  # Only fetch and check out these west projects
 
   # ccache configuration 
 , ccacheMaxSize ? "500M"
+, enableCcache ? true  # Set to false to build without ccache
 
   # West integration
 , manifestPath ? "."  # Path to manifest directory for westinit
@@ -27,34 +43,158 @@
 
   # Additional build inputs for the devShell
 , extraBuildInputs ? []
+
+  # OCI image configuration
+, imageName ? "zephyr-env"
 }:
 
 let
   # Zephyr SDK
-  sdk = pkgs.callPackage ../pkgs/zephyr-sdk {
+  sdk = zephyrSdk.override {
     version = sdkVersion;
     inherit architectures;
   };
 
-  # Native build tools (cmake, ninja, dtc, etc.)
-  dependencies = import ./mkZephyrDependencies.nix { inherit pkgs; };
-
-  # West projects - user must provide westlock.nix as a path
-  westProjects = west-nix-lib.mkWestProjects westlockPath;
+  # West projects - user must provide westlock.nix or westlock.json as a path
+  westProjects = west-nix-lib.mkWestProjects (resolveWestlock {
+    inherit westlockPath;
+    projectNames = westProjectNames;
+  });
 
   # West workspace setup script
   westWorkspaceSetup = west-nix-lib.mkWestWorkspace { inherit westProjects; };
 
   # Python environment setup script
-  pythonEnvSetup = (import ./mkPythonEnv { inherit pkgs; }) {
+  pythonEnvSetup = mkPythonEnv {
     workspaceRoot = workspaceRoot;
     inherit pythonVersion;
   };
 
   # ccache configuration script
-  ccacheSetup = (import ./mkCrossCCache.nix { inherit pkgs; }) {
+  ccacheSetup = mkCrossCCache {
     workspaceRoot = workspaceRoot;
     maxSize = ccacheMaxSize;
+    enable = enableCcache;
+  };
+
+  # Parallel multi-board build runner sharing one jobserver and the ccache
+  buildMatrix = mkBuildMatrix {
+    workspaceRoot = workspaceRoot;
+    inherit ccacheSetup;
+  };
+
+  # Store paths the workspace depends on, rooted under gcRootsPath so that
+  # nix-collect-garbage cannot evict them from a live workspace
+  gcRoots = {
+    "west-workspace" = westWorkspaceSetup;
+    "python-env-setup" = pythonEnvSetup;
+    "cross-ccache" = ccacheSetup;
+    "zephyr-build-matrix" = buildMatrix;
+  } // builtins.listToAttrs (map (dep: {
+    # Store path names are unique, unlike package names
+    name = builtins.unsafeDiscardStringContext (baseNameOf dep.outPath);
+    value = dep;
+  }) (dependencies ++ extraBuildInputs));
+
+  # GC root management for the workspace
+  gcRootsScript = pkgs.writeShellApplication {
+    name = "zephyr-env-gcroots";
+
+    text = ''
+      # Usage: zephyr-env-gcroots [add|list|prune|enable]
+      #   add     Register indirect GC roots for the SDK and workspace inputs
+      #   list    Show the GC roots registered by this workspace
+      #   prune   Remove them and keep the workspace unrooted, so
+      #           nix-collect-garbage may evict the SDK
+      #   enable  Undo prune and register the roots again
+
+      have_nix_store=true
+      if ! command -v nix-store > /dev/null; then
+        have_nix_store=false
+      fi
+
+      # Written by prune, add then leaves the workspace unrooted
+      disabled="${workspaceRoot}/.gcroots-disabled"
+
+      # Set when a root fell back to a plain symlink, so the next add retries
+      unregistered="${gcRootsPath}/.unregistered"
+      retry=false
+      if [ -e "$unregistered" ]; then
+        retry=true
+      fi
+
+      add_root() {
+        local root="$1" path="$2" error
+        # Already rooted from a previous shell entry, skip the daemon call
+        if [ "$retry" = false ] && [ "$(readlink "$root" 2>/dev/null || true)" = "$path" ]; then
+          return
+        fi
+        rm -f "$root"
+        if [ "$have_nix_store" = true ]; then
+          if error=$(nix-store --add-root "$root" --indirect --realise "$path" 2>&1 > /dev/null); then
+            return
+          fi
+          echo "⚠️  Failed to register GC root $root, using a plain symlink:" >&2
+          echo "$error" >&2
+        fi
+        ln -s "$path" "$root"
+        touch "$unregistered"
+      }
+
+      case "''${1:-list}" in
+        add)
+          # Skip the toolchain link too: nix keeps following an indirect
+          # root's path, so any symlink there would root the SDK again
+          if [ -e "$disabled" ]; then
+            echo "GC roots are disabled for ${workspaceRoot}, restore with: zephyr-env-gcroots enable" >&2
+            exit 0
+          fi
+
+          if [ "$have_nix_store" = false ]; then
+            echo "⚠️  nix-store not found, workspace symlinks will not be GC roots" >&2
+          fi
+
+          mkdir -p "$(dirname "${toolchainPath}")" "${gcRootsPath}"
+          rm -f "$unregistered"
+          add_root "${toolchainPath}" "${sdk}"
+
+          # Drop roots for inputs the workspace no longer uses
+          for root in "${gcRootsPath}"/*; do
+            case "$(basename "$root")" in
+              ${pkgs.lib.concatMapStringsSep "|" pkgs.lib.escapeShellArg (builtins.attrNames gcRoots)}) ;;
+              *) rm -f "$root" ;;
+            esac
+          done
+
+          ${pkgs.lib.concatStringsSep "\n          " (pkgs.lib.mapAttrsToList
+            (name: path: ''add_root "${gcRootsPath}/${name}" "${path}"'') gcRoots)}
+          ;;
+        list)
+          for root in "${toolchainPath}" "${gcRootsPath}"/*; do
+            if [ -L "$root" ]; then
+              echo "$root -> $(readlink "$root")"
+            fi
+          done
+          ;;
+        prune)
+          rm -f "${toolchainPath}"
+          rm -rf "${gcRootsPath}"
+          mkdir -p "${workspaceRoot}"
+          touch "$disabled"
+          echo "Removed GC roots for ${workspaceRoot}; they stay off until: zephyr-env-gcroots enable"
+          echo "Reclaim space with: nix-collect-garbage"
+          ;;
+        enable)
+          rm -f "$disabled"
+          exec "$0" add
+          ;;
+        *)
+          echo "Error: Unknown command: $1" >&2
+          echo "Usage: zephyr-env-gcroots [add|list|prune|enable]" >&2
+          exit 1
+          ;;
+      esac
+    '';
   };
 
   # Main setup script that orchestrates everything (initialization only, no sourcing)
@@ -69,10 +209,8 @@ let
 *
 EOF
 
-    # 1. Setup SDK symlink
-    mkdir -p "$(dirname "${toolchainPath}")"
-    rm -f "${toolchainPath}"
-    ln -sf "${sdk}" "${toolchainPath}"
+    # 1. Setup SDK symlink and GC roots for every workspace input
+    ${gcRootsScript}/bin/zephyr-env-gcroots add
 
     # 2. Setup West workspace (only if not already initialized)
     if [ ! -d "${westWorkspaceRoot}/.west" ]; then
@@ -88,6 +226,94 @@ EOF
     ${pythonEnvSetup}/bin/python-env-setup "${workspaceRoot}" "${pylockPath}"
   '';
 
+  # Interpreter for the workspace venv, so uv does not download one
+  python = pkgs."python${builtins.replaceStrings [ "." ] [ "" ] pythonVersion}";
+
+  # The pylock.toml venv, built offline from the dists pinned in the lock.
+  # Needs a lock that is readable at evaluation time, e.g. ./pylock.toml.
+  pythonVenv =
+    if builtins.isPath pylockPath || pkgs.lib.hasPrefix "${builtins.storeDir}/" (toString pylockPath) then
+      mkPythonVenv { inherit pylockPath python; }
+    else
+      null;
+
+  # Image components, from least to most volatile. Paths are linked into the
+  # image root unless link is false.
+  imageComponents = [
+    {
+      name = "base";
+      paths = [
+        pkgs.bashInteractive
+        pkgs.coreutils
+        pkgs.dockerTools.binSh
+        pkgs.dockerTools.usrBinEnv
+        pkgs.dockerTools.caCertificates
+        pkgs.dockerTools.fakeNss
+      ];
+    }
+    { name = "dependencies"; paths = dependencies ++ extraBuildInputs; }
+    { name = "python"; paths = [ python ]; }
+    { name = "sdk"; paths = [ sdk ]; }
+    { name = "python-venv"; paths = pkgs.lib.optional (pythonVenv != null) pythonVenv; link = false; }
+    { name = "west"; paths = [ westWorkspaceSetup ]; }
+    { name = "tools"; paths = [ setupScript pythonEnvSetup ccacheSetup buildMatrix gcRootsScript ]; }
+  ];
+
+  # Peel each component's closure off the rest of the image, so its layer
+  # holds only the store paths that no earlier component needs
+  layeringPipeline = components:
+    let
+      component = builtins.head components;
+      rest = builtins.tail components;
+    in
+    [ [ "subcomponent_out" component.paths ] ]
+    ++ pkgs.lib.optional (rest != [ ]) [ "over" "rest" [ "pipe" (layeringPipeline rest) ] ];
+
+  imageRoot = pkgs.buildEnv {
+    name = "${imageName}-root";
+    paths = pkgs.lib.concatMap (component: if component.link or true then component.paths else [ ])
+      imageComponents;
+    pathsToLink = [ "/bin" "/etc" "/usr" ];
+    # Components are linked in order, later ones win like layered files would
+    ignoreCollisions = true;
+    # Reference every path, so components without bin/ (like the SDK) are
+    # still in the image closure
+    postBuild = ''
+      mkdir -p $out/etc/zephyr-nix
+      ${pkgs.lib.concatMapStrings (component: ''
+        echo ${pkgs.lib.escapeShellArgs component.paths} > $out/etc/zephyr-nix/${component.name}-paths
+      '') imageComponents}
+    '';
+  };
+
+  # Provisioned environment for CI runners with one layer per component, so
+  # a registry deduplicates unchanged components across image versions.
+  # The image is streamed, only the small stream script is in the store.
+  # Load with: $(nix build --print-out-paths .#...image) | docker load
+  image = pkgs.dockerTools.streamLayeredImage {
+    name = imageName;
+    contents = [ imageRoot ];
+    layeringPipeline = layeringPipeline (builtins.filter (component: component.paths != [ ]) imageComponents);
+    extraCommands = ''
+      mkdir -p tmp workspace
+      chmod 1777 tmp
+    '';
+    config = {
+      Cmd = [ "${pkgs.bashInteractive}/bin/bash" ];
+      WorkingDir = "/workspace";
+      Env = [
+        "ZEPHYR_SDK_INSTALL_DIR=${sdk}"
+        "ZEPHYR_TOOLCHAIN_VARIANT=zephyr"
+        "CMAKE_PREFIX_PATH=${sdk}/cmake"
+        "SSL_CERT_FILE=/etc/ssl/certs/ca-bundle.crt"
+      ] ++ pkgs.lib.optional (pythonVenv != null) "PYTHON_ENV_PREBUILT=${pythonVenv}";
+    };
+    passthru.components = builtins.listToAttrs (map (component: {
+      inherit (component) name;
+      value = component.paths;
+    }) imageComponents);
+  };
+
 in
 pkgs.mkShell {
   packages = [
@@ -95,6 +321,8 @@ pkgs.mkShell {
     sdk
     pythonEnvSetup
     ccacheSetup
+    buildMatrix
+    gcRootsScript
     westWorkspaceSetup
   ]
     ++ dependencies
@@ -109,13 +337,17 @@ pkgs.mkShell {
     source ${ccacheSetup}/bin/cross-ccache-setup
     source "${westWorkspaceRoot}/env.sh"
     source "${venvPath}/bin/activate"
+
+    # Verify that SDK compiles actually go through ccache
+    ${ccacheSetup}/bin/cross-ccache-check || true
   '';
 
   passthru = {
-    inherit sdk pythonEnvSetup dependencies setupScript ccacheSetup;
+    inherit sdk pythonEnvSetup dependencies setupScript ccacheSetup buildMatrix;
+    inherit gcRoots gcRootsScript image python pythonVenv;
     inherit westProjects westWorkspaceSetup;
     inherit sdkVersion architectures pythonVersion;
-    inherit workspaceRoot westWorkspaceRoot venvPath toolchainPath ccachePath;
-    inherit westlockPath pylockPath ccacheMaxSize;
+    inherit workspaceRoot westWorkspaceRoot venvPath toolchainPath ccachePath gcRootsPath;
+    inherit westlockPath westProjectNames pylockPath ccacheMaxSize enableCcache;
   };
 }
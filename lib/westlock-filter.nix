@@ -0,0 +1,24 @@
+# Keep only the named projects of a westlock, see westlock.nix. This runs
+# inside the file mkWestProjects imports, so the lock is parsed once and
+# only the project names are forced before filtering.
+{ lock
+, projectNames
+, source
+}:
+
+let
+  projectName = project: project.name or (throw "westlock project without a name in ${source}");
+
+  lockedNames = if builtins.isList lock then map projectName lock else builtins.attrNames lock;
+
+  missing = builtins.filter (name: !(builtins.elem name lockedNames)) projectNames;
+
+in
+if !(builtins.isList lock || builtins.isAttrs lock) then
+  throw "westProjectNames requires a westlock that is a list or attribute set, ${source} is a ${builtins.typeOf lock}"
+else if missing != [ ] then
+  throw "westProjectNames not found in ${source}: ${builtins.concatStringsSep ", " missing}"
+else if builtins.isList lock then
+  builtins.filter (project: builtins.elem (projectName project) projectNames) lock
+else
+  builtins.intersectAttrs (builtins.listToAttrs (map (name: { inherit name; value = null; }) projectNames)) lock
@@ -0,0 +1,38 @@
+# Resolve a westlock for west-nix's mkWestProjects.
+#
+# westlockPath is a path (./westlock.nix) or an absolute path string such
+# as "${inputs.app}/westlock.nix". A westlock.json (see
+# `update --westlock westlock.json`) is read with builtins.fromJSON, which is
+# cheaper to parse than the equivalent Nix file for manifests with many
+# projects. When projectNames is set, mkWestProjects only sees those
+# projects. That saves the fetchers and derivations of the others, but the
+# whole lock is still parsed.
+{ westlockPath
+, projectNames ? null
+}:
+
+let
+  isJSON = builtins.match ".*\\.json" (toString westlockPath) != null;
+
+  # mkWestProjects imports the lock, so hand it a Nix file that loads it
+  load = if isJSON then "builtins.fromJSON (builtins.readFile ${westlockPath})" else "import ${westlockPath}";
+
+  filtered = ''
+    import ${./westlock-filter.nix} {
+      lock = ${load};
+      projectNames = [ ${builtins.concatStringsSep " " (map builtins.toJSON projectNames)} ];
+      source = ${builtins.toJSON (baseNameOf (toString westlockPath))};
+    }
+  '';
+
+in
+if !(builtins.isPath westlockPath || builtins.isString westlockPath) then
+  throw "westlockPath must be a path such as ./westlock.nix, not ${builtins.typeOf westlockPath}"
+else if builtins.isString westlockPath && builtins.substring 0 1 westlockPath != "/" then
+  throw "westlockPath must be a path such as ./westlock.nix or an absolute string, not the relative \"${westlockPath}\""
+else if projectNames != null then
+  builtins.toFile "westlock.nix" filtered
+else if isJSON then
+  builtins.toFile "westlock.nix" load
+else
+  westlockPath
@@ -14,7 +14,7 @@ pkgs.writeShellApplication {
     description = "Update westlock.nix and pylock.toml for Zephyr projects";
     longDescription = ''
       Synchronizes Zephyr project dependencies by:
-      1. Generating westlock.nix from west manifest
+      1. Generating westlock.nix (or westlock.json) from west manifest
       2. Creating temporary venv and installing west dependencies
       3. Generating pylock.toml from installed packages
     '';
@@ -6,6 +6,7 @@ set -euo pipefail
 #
 # Options:
 #   --westlock PATH    Output path for westlock.nix (default: westlock.nix)
+#                      A .json path writes a JSON westlock that evaluates faster
 #   --pylock PATH      Output path for pylock.toml (default: pylock.toml)
 #   --venv PATH        Existing venv path to reuse (optional, creates temp if not specified)
 #   --python-version V Python version for pylock.toml (default: 3.12)
@@ -46,7 +47,7 @@ while [[ $# -gt 0 ]]; do
       shift
       ;;
     --help)
-      sed -n '3,15p' "$0" | sed 's/^# //'
+      sed -n '3,16p' "$0" | sed 's/^# //'
       exit 0
       ;;
     -*)
@@ -97,6 +98,9 @@ fi
 # Will be set after creating workspace
 WEST_WORKSPACE=""
 
+# Will be set when converting westlock.nix to westlock.json
+WESTLOCK_NIX_TMP=""
+
 # Logging helpers
 log() {
   if [ "$VERBOSE" = true ]; then
@@ -106,6 +110,9 @@ log() {
 
 # Cleanup function
 cleanup() {
+  if [ -n "$WESTLOCK_NIX_TMP" ]; then
+    rm -f "$WESTLOCK_NIX_TMP"
+  fi
   if [ -n "$WEST_WORKSPACE" ]; then
     log "Cleaning up temporary workspace at $WEST_WORKSPACE..."
     rm -rf "$WEST_WORKSPACE"
@@ -120,9 +127,25 @@ trap cleanup EXIT
 # Step 1: Resolve absolute path to manifest before any directory changes
 MANIFEST_FILE_ABS="$(realpath "$MANIFEST_FILE")"
 
-# Step 2: Generate westlock.nix
+# Step 2: Generate westlock.nix (or westlock.json)
 log "Generating $WESTLOCK_PATH from $MANIFEST_FILE..."
-westupdate "$MANIFEST_FILE_ABS" > "$WESTLOCK_PATH"
+if [[ "$WESTLOCK_PATH" == *.json ]]; then
+  # The caller's nix converts the lock, update does not ship its own
+  if ! command -v nix-instantiate > /dev/null; then
+    echo "Error: nix-instantiate not found, it is needed to write $WESTLOCK_PATH" >&2
+    echo "Run update with nix on PATH, or pass --westlock westlock.nix" >&2
+    exit 1
+  fi
+  WESTLOCK_NIX_TMP=$(mktemp --suffix=.nix)
+  westupdate "$MANIFEST_FILE_ABS" > "$WESTLOCK_NIX_TMP"
+  if ! nix-instantiate --eval --strict --json "$WESTLOCK_NIX_TMP" > "$WESTLOCK_PATH"; then
+    rm -f "$WESTLOCK_PATH"
+    echo "Error: Failed to convert westlock to JSON" >&2
+    exit 1
+  fi
+else
+  westupdate "$MANIFEST_FILE_ABS" > "$WESTLOCK_PATH"
+fi
 log "✓ Generated $WESTLOCK_PATH"
 
 # Step 3: Create venv if it doesn't exist or is invalid
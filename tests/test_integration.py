@@ -1,11 +1,90 @@
 """Integration tests for mkZephyrEnv - validates complete environment setup."""
 
+import os
 import subprocess
+import tempfile
 from pathlib import Path
 
+import pytest
+
 from conftest import REPO_ROOT
 
 
+# CPU time budget in seconds for evaluating the full mkZephyrEnv devShell
+# drvPath with a westlock of LARGE_WESTLOCK_PROJECTS projects
+EVAL_TIME_BUDGET_S = 5.0
+LARGE_WESTLOCK_PROJECTS = 55
+
+
+@pytest.fixture(scope="module")
+def large_westlock(tmp_path_factory: pytest.TempPathFactory) -> dict[str, Path]:
+    """Generate westlock.nix and westlock.json for a manifest of many local projects.
+
+    The locks are produced by the update command from a west.yml whose
+    projects are local git repositories, so they match what users get.
+    """
+    root = tmp_path_factory.mktemp("westlock")
+    repos = root / "repos"
+
+    projects = []
+    for i in range(LARGE_WESTLOCK_PROJECTS):
+        name = f"project-{i:02d}"
+        repo = repos / name
+        repo.mkdir(parents=True)
+        (repo / "README").write_text(f"{name}\n")
+        for command in (
+            ["git", "init", "-q", "-b", "main"],
+            ["git", "add", "README"],
+            ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", name],
+        ):
+            subprocess.run(command, cwd=repo, check=True)
+        projects.append(f"    - name: {name}\n      remote: local\n      revision: main\n      path: modules/{name}\n")
+
+    (root / "west.yml").write_text(
+        "manifest:\n"
+        "  remotes:\n"
+        "    - name: local\n"
+        f"      url-base: file://{repos}\n"
+        "  projects:\n" + "".join(projects)
+    )
+
+    locks = {}
+    for form in ("nix", "json"):
+        lock = root / f"westlock.{form}"
+        result = subprocess.run(
+            [
+                "nix", "run", f"{REPO_ROOT}#update", "--",
+                "--westlock", str(lock),
+                "--pylock", str(root / f"pylock-{form}.toml"),
+                "west.yml",
+            ],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=600,
+        )
+        assert result.returncode == 0, f"update failed for {lock.name}: {result.stderr}"
+        locks[form] = lock
+
+    return locks
+
+
+def eval_zephyr_env(args: str, attr: str, env: dict[str, str] | None = None) -> subprocess.CompletedProcess[str]:
+    """Evaluate an attribute of mkZephyrEnv called with the given Nix arguments."""
+    return subprocess.run(
+        [
+            "nix", "eval", "--impure", "--raw", f"{REPO_ROOT}#lib.x86_64-linux.mkZephyrEnv",
+            "--apply", f'f: (f {{ sdkVersion = "0.17.4"; architectures = ["arm"]; {args} }}).{attr}',
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=120,
+        env=env,
+    )
+
+
 def test_mkZephyrEnv_evaluates() -> None:
     """Test that mkZephyrEnv with required params evaluates successfully."""
     result = subprocess.run(
@@ -133,6 +212,57 @@ def test_mkZephyrEnv_custom_ccache_size() -> None:
     assert "1G" in result.stdout
 
 
+def test_mkZephyrEnv_ccache_opt_out() -> None:
+    """Test that enableCcache = false disables ccache in the setup script."""
+    result = subprocess.run(
+        [
+            "nix", "build", "--impure", "--no-link", "--print-out-paths", "--expr",
+            f'((builtins.getFlake "path:{REPO_ROOT}").lib.x86_64-linux.mkZephyrEnv '
+            '{ sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; enableCcache = false; }).passthru.ccacheSetup',
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=300,
+    )
+
+    assert result.returncode == 0, f"Build failed: {result.stderr}"
+
+    ccache_setup = Path(result.stdout.strip())
+    assert "CCACHE_DISABLE=1" in (ccache_setup / "bin" / "cross-ccache-setup").read_text()
+    assert (ccache_setup / "bin" / "cross-ccache-check").exists()
+
+
+def test_mkZephyrEnv_ccache_keeps_user_opt_out(tmp_path: Path) -> None:
+    """Test that the enabled setup script keeps a developer's CCACHE_DISABLE."""
+    result = subprocess.run(
+        [
+            "nix", "build", "--impure", "--no-link", "--print-out-paths", "--expr",
+            f'((builtins.getFlake "path:{REPO_ROOT}").lib.x86_64-linux.mkZephyrEnv '
+            '{ sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; }).passthru.ccacheSetup',
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=300,
+    )
+
+    assert result.returncode == 0, f"Build failed: {result.stderr}"
+
+    setup = Path(result.stdout.strip()) / "bin" / "cross-ccache-setup"
+    result = subprocess.run(
+        ["bash", "-c", f'source {setup} && echo "CCACHE_DISABLE=${{CCACHE_DISABLE:-}}"'],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        check=False,
+        env={**os.environ, "CCACHE_DISABLE": "1"},
+    )
+
+    assert result.returncode == 0, f"Setup failed: {result.stderr}"
+    assert "CCACHE_DISABLE=1" in result.stdout
+
+
 def test_mkZephyrEnv_python_version() -> None:
     """Test that pythonVersion parameter is accessible via passthru."""
     result = subprocess.run(
@@ -150,13 +280,518 @@ def test_mkZephyrEnv_python_version() -> None:
     assert "3.11" in result.stdout, f"Python version not passed through: {result.stdout}"
 
 
+def test_mkZephyrApp_evaluates() -> None:
+    """Test that mkZephyrApp names the derivation after the app and board."""
+    result = subprocess.run(
+        [
+            "nix", "eval", f"{REPO_ROOT}#lib.x86_64-linux.mkZephyrApp",
+            "--apply", 'f: (f { src = /tmp/hello_world; pname = "hello_world"; board = "nrf5340dk/nrf5340/cpuapp"; sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; }).name',
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, f"Eval failed: {result.stderr}"
+    assert "hello_world-nrf5340dk-nrf5340-cpuapp" in result.stdout, f"Unexpected name: {result.stdout}"
+
+
+def test_mkZephyrApp_name_has_no_store_hash() -> None:
+    """Test that the default name comes from the source name, not its store path."""
+    result = subprocess.run(
+        [
+            "nix", "eval", f"{REPO_ROOT}#lib.x86_64-linux.mkZephyrApp",
+            "--apply", 'f: (f { src = { name = "blinky"; outPath = "/tmp/blinky"; }; board = "qemu_cortex_m3"; sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; }).name',
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, f"Eval failed: {result.stderr}"
+    assert result.stdout.strip() == '"blinky-qemu_cortex_m3"', f"Unexpected name: {result.stdout}"
+
+
+def test_mkZephyrApp_shares_sdk_with_mkZephyrEnv() -> None:
+    """Test that mkZephyrApp and mkZephyrEnv resolve the same SDK store path."""
+    args = '{ sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; }'
+    result = subprocess.run(
+        [
+            "nix", "eval", f"{REPO_ROOT}#lib.x86_64-linux",
+            "--apply",
+            f'lib: (lib.mkZephyrApp ({args} // {{ src = /tmp/app; board = "qemu_cortex_m3"; }})).passthru.sdk.drvPath'
+            f' == (lib.mkZephyrEnv {args}).passthru.sdk.drvPath',
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, f"Eval failed: {result.stderr}"
+    assert result.stdout.strip() == "true"
+
+
+def test_mkZephyrApp_builds_hello_world() -> None:
+    """Test that mkZephyrApp runs west build in the sandbox and installs the artifacts."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app_dir = Path(tmpdir) / "hello_world"
+        (app_dir / "app" / "src").mkdir(parents=True)
+
+        # Lock only the projects a Cortex-M hello_world needs
+        (app_dir / "west.yml").write_text(
+            "manifest:\n"
+            "  projects:\n"
+            "    - name: zephyr\n"
+            "      url: https://github.com/zephyrproject-rtos/zephyr\n"
+            "      revision: v4.2.0\n"
+            "      import:\n"
+            "        name-allowlist:\n"
+            "          - cmsis_6\n"
+            "          - hal_nordic\n"
+        )
+        (app_dir / "app" / "CMakeLists.txt").write_text(
+            "cmake_minimum_required(VERSION 3.20.0)\n"
+            "find_package(Zephyr REQUIRED HINTS $ENV{ZEPHYR_BASE})\n"
+            "project(hello_world)\n"
+            "target_sources(app PRIVATE src/main.c)\n"
+        )
+        (app_dir / "app" / "prj.conf").write_text("")
+        (app_dir / "app" / "src" / "main.c").write_text(
+            "#include <stdio.h>\n\nint main(void)\n{\n\tprintf(\"Hello World!\\n\");\n\treturn 0;\n}\n"
+        )
+
+        result = subprocess.run(
+            [
+                "nix", "run", f"{REPO_ROOT}#update", "--",
+                "--westlock", "westlock.nix",
+                "--pylock", str(Path(tmpdir) / "pylock.toml"),
+                "west.yml",
+            ],
+            cwd=app_dir,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=600,
+        )
+        assert result.returncode == 0, f"update failed: {result.stderr}"
+
+        flake_content = f"""
+{{
+  inputs = {{
+    zephyr-nix.url = "path:{REPO_ROOT}";
+    nixpkgs.follows = "zephyr-nix/nixpkgs";
+  }};
+
+  outputs = {{ self, zephyr-nix, nixpkgs }}: {{
+    packages.x86_64-linux.default = zephyr-nix.lib.x86_64-linux.mkZephyrApp {{
+      src = ./.;
+      pname = "hello_world";
+      board = "qemu_cortex_m3";
+      sdkVersion = "0.17.4";
+      architectures = [ "arm" ];
+      westlockPath = ./westlock.nix;
+      westProjectNames = [ "zephyr" "cmsis_6" ];
+      appPath = "app";
+      artifacts = [ "zephyr.elf" ];
+    }};
+  }};
+}}
+"""
+        (app_dir / "flake.nix").write_text(flake_content)
+
+        result = subprocess.run(
+            ["nix", "build", ".#default", "--out-link", "result"],
+            cwd=app_dir,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=3600,
+        )
+
+        assert result.returncode == 0, f"Build failed: {result.stderr}"
+        assert (app_dir / "result" / "zephyr.elf").is_file()
+        assert (app_dir / "result" / ".config").is_file()
+
+
+def test_mkZephyrEnv_has_build_matrix() -> None:
+    """Test that mkZephyrEnv ships the zephyr-build-matrix command."""
+    result = subprocess.run(
+        [
+            "nix", "eval", f"{REPO_ROOT}#lib.x86_64-linux.mkZephyrEnv",
+            "--apply", 'f: (f { sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; }).passthru.buildMatrix.name',
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, f"Eval failed: {result.stderr}"
+    assert "zephyr-build-matrix" in result.stdout, f"Build matrix not found: {result.stdout}"
+
+
+def test_build_matrix_shares_jobserver(tmp_path: Path) -> None:
+    """Test that zephyr-build-matrix hands a fifo jobserver to each west build."""
+    env = (
+        f'((builtins.getFlake "path:{REPO_ROOT}").lib.x86_64-linux.mkZephyrEnv '
+        '{ sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; }).passthru'
+    )
+    result = subprocess.run(
+        ["nix", "build", "--impure", "--no-link", "--print-out-paths", "--expr", f"{env}.buildMatrix"],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=600,
+    )
+
+    assert result.returncode == 0, f"Build failed: {result.stderr}"
+    build_matrix = Path(result.stdout.strip()) / "bin" / "zephyr-build-matrix"
+
+    # Stub west records the MAKEFLAGS it was started with
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    west = bin_dir / "west"
+    west.write_text(
+        "#!/usr/bin/env bash\n"
+        "while [ $# -gt 0 ]; do\n"
+        '  case $1 in --build-dir) dir=$2; shift 2 ;; *) shift ;; esac\n'
+        "done\n"
+        'echo "$MAKEFLAGS" > "$dir/makeflags"\n'
+    )
+    west.chmod(0o755)
+
+    # Same basename in two dirs, a repeated target, a path make and the
+    # shell must not expand, and a last line without a newline
+    workspace = tmp_path / "workspace"
+    for app in ("a/blinky", "b/blinky", "app $HOME"):
+        (workspace / app).mkdir(parents=True)
+    (workspace / "targets").write_text(
+        "a/blinky:qemu_cortex_m3  # comment\n"
+        "\n"
+        "b/blinky:qemu_cortex_m3\n"
+        "a/blinky:qemu_cortex_m3\n"
+        "app $HOME:nrf5340dk/nrf5340/cpuapp"
+    )
+
+    result = subprocess.run(
+        [str(build_matrix), "--jobs", "4", "--targets", "targets"],
+        cwd=workspace,
+        capture_output=True,
+        text=True,
+        check=False,
+        env={
+            **os.environ,
+            "PATH": f"{bin_dir}:{os.environ['PATH']}",
+            "CCACHE_DIR": str(tmp_path / "ccache"),
+        },
+        timeout=60,
+    )
+
+    assert result.returncode == 0, f"Build matrix failed: {result.stderr}"
+
+    build_root = workspace / ".zephyr-nix" / "build-matrix"
+    build_dirs = sorted(path.name for path in build_root.iterdir() if path.is_dir())
+    assert build_dirs == [
+        "a_blinky@qemu_cortex_m3",
+        "app $HOME@nrf5340dk_nrf5340_cpuapp",
+        "b_blinky@qemu_cortex_m3",
+    ]
+    for build_dir in build_dirs:
+        makeflags = (build_root / build_dir / "makeflags").read_text()
+        assert "--jobserver-auth=fifo:" in makeflags, f"No fifo jobserver for {build_dir}: {makeflags}"
+
+    # One summary row per unique target, the name column is 40 wide
+    rows = [line[:40].rstrip() for line in result.stdout.splitlines() if " ok " in line]
+    assert sorted(rows) == [
+        "a/blinky:qemu_cortex_m3",
+        "app $HOME:nrf5340dk/nrf5340/cpuapp",
+        "b/blinky:qemu_cortex_m3",
+    ]
+    assert "TOTAL (sum of targets)" in result.stdout
+
+
+def test_mkZephyrEnv_gc_roots() -> None:
+    """Test that mkZephyrEnv roots its workspace inputs under gcRootsPath."""
+    result = subprocess.run(
+        [
+            "nix", "eval", f"{REPO_ROOT}#lib.x86_64-linux.mkZephyrEnv",
+            "--apply", 'f: builtins.attrNames (f { sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; }).passthru.gcRoots',
+            "--json",
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, f"Eval failed: {result.stderr}"
+
+    import json
+    roots = json.loads(result.stdout)
+
+    for root in ["west-workspace", "python-env-setup", "cross-ccache"]:
+        assert root in roots, f"GC root {root} missing"
+
+    # Dependencies are keyed on their store path name, e.g. <hash>-cmake-3.31.6
+    for dep in ["cmake", "ninja"]:
+        assert any(root.split("-", 1)[-1].startswith(f"{dep}-") for root in roots), \
+            f"GC root for {dep} missing"
+
+
+def test_mkZephyrEnv_gc_roots_script(tmp_path: Path) -> None:
+    """Test zephyr-env-gcroots add, list, prune and enable in a workspace."""
+    env = (
+        f'((builtins.getFlake "path:{REPO_ROOT}").lib.x86_64-linux.mkZephyrEnv '
+        '{ sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; }).passthru'
+    )
+    result = subprocess.run(
+        [
+            "nix", "eval", "--impure", "--json", "--expr",
+            f"let env = {env}; in {{ roots = builtins.attrNames env.gcRoots; sdk = env.sdk.outPath; }}",
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=120,
+    )
+    assert result.returncode == 0, f"Eval failed: {result.stderr}"
+
+    import json
+    expected = json.loads(result.stdout)
+
+    result = subprocess.run(
+        ["nix", "build", "--impure", "--no-link", "--print-out-paths", "--expr", f"{env}.gcRootsScript"],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=1800,
+    )
+    assert result.returncode == 0, f"Build failed: {result.stderr}"
+    gcroots = Path(result.stdout.strip()) / "bin" / "zephyr-env-gcroots"
+
+    workspace = tmp_path / ".zephyr-nix"
+    toolchain = workspace / ".toolchain"
+    roots_dir = workspace / ".gcroots"
+
+    def run(command: str) -> subprocess.CompletedProcess[str]:
+        result = subprocess.run(
+            [str(gcroots), command],
+            cwd=tmp_path,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=1800,
+        )
+        assert result.returncode == 0, f"{command} failed: {result.stderr}"
+        return result
+
+    def registered_roots() -> str:
+        result = subprocess.run(
+            ["nix-store", "--gc", "--print-roots"],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=120,
+        )
+        assert result.returncode == 0, f"print-roots failed: {result.stderr}"
+        return result.stdout
+
+    run("add")
+    assert os.readlink(toolchain) == expected["sdk"]
+    assert sorted(path.name for path in roots_dir.iterdir() if path.is_symlink()) == sorted(expected["roots"])
+    assert not (roots_dir / ".unregistered").exists(), "Roots fell back to plain symlinks"
+    assert str(toolchain) in registered_roots()
+
+    listing = run("list").stdout
+    assert f"{toolchain} -> {expected['sdk']}" in listing
+    assert len(listing.splitlines()) == len(expected["roots"]) + 1
+
+    # prune keeps the workspace unrooted across later shell entries
+    run("prune")
+    assert not toolchain.exists()
+    assert not roots_dir.exists()
+
+    run("add")
+    assert not toolchain.exists()
+    assert not roots_dir.exists()
+    assert str(toolchain) not in registered_roots()
+
+    run("enable")
+    assert sorted(path.name for path in roots_dir.iterdir() if path.is_symlink()) == sorted(expected["roots"])
+    assert str(toolchain) in registered_roots()
+
+
+def test_mkZephyrEnv_image() -> None:
+    """Test that mkZephyrEnv exposes an OCI image named after imageName."""
+    result = subprocess.run(
+        [
+            "nix", "eval", f"{REPO_ROOT}#lib.x86_64-linux.mkZephyrEnv",
+            "--apply", 'f: (f { sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; imageName = "zephyr-ci"; }).passthru.image.name',
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, f"Eval failed: {result.stderr}"
+    assert "zephyr-ci" in result.stdout, f"Unexpected image name: {result.stdout}"
+
+
+def test_mkZephyrEnv_image_layers(tmp_path: Path) -> None:
+    """Test that the SDK and the prebuilt venv get layers of their own in the image."""
+    from test_mkPythonEnv import FIXTURES_DIR, generate_pylock_toml
+
+    pylock_path = tmp_path / "pylock.toml"
+    generate_pylock_toml(FIXTURES_DIR / "simple" / "requirements.in", pylock_path)
+
+    env = (
+        f'((builtins.getFlake "path:{REPO_ROOT}").lib.x86_64-linux.mkZephyrEnv '
+        '{ sdkVersion = "0.17.4"; architectures = ["arm"]; westlockPath = /tmp/westlock.nix; '
+        f'pylockPath = {pylock_path}; }}).passthru'
+    )
+    result = subprocess.run(
+        [
+            "nix", "build", "--impure", "--no-link", "--print-out-paths", "--expr",
+            f"let env = {env}; in [ env.image env.sdk env.python env.pythonVenv ]",
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+        timeout=1800,
+    )
+
+    assert result.returncode == 0, f"Build failed: {result.stderr}"
+
+    stream_image, sdk_path, python_path, venv_path = result.stdout.split()
+
+    # The locked packages are installed at build time, not on the runner
+    result = subprocess.run(
+        [f"{venv_path}/bin/python", "-c", "import certifi"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, f"certifi not in the prebuilt venv: {result.stderr}"
+
+    image_path = tmp_path / "image.tar"
+    with image_path.open("wb") as image_file:
+        subprocess.run([stream_image], stdout=image_file, check=True, timeout=1800)
+
+    import json
+    import tarfile
+
+    with tarfile.open(image_path) as image:
+        manifest = json.load(image.extractfile("manifest.json"))
+        config = json.load(image.extractfile(manifest[0]["Config"]))
+        assert f"PYTHON_ENV_PREBUILT={venv_path}" in config["config"]["Env"]
+
+        layers = {}
+        for name in manifest[0]["Layers"]:
+            with tarfile.open(fileobj=image.extractfile(name)) as layer:
+                layers[name] = {
+                    member.removeprefix("./").split("/")[2]
+                    for member in layer.getnames()
+                    if member.removeprefix("./").startswith("nix/store/") and member.count("/") >= 2
+                }
+
+    def layers_with(store_path: str) -> list[str]:
+        return [name for name, paths in layers.items() if Path(store_path).name in paths]
+
+    for component in (sdk_path, venv_path):
+        holders = layers_with(component)
+        assert len(holders) == 1, f"{component} is in {len(holders)} layers"
+        assert layers_with(python_path) != holders, f"Python interpreter shares a layer with {component}"
+
+    assert layers_with(sdk_path) != layers_with(venv_path)
+
+
+@pytest.mark.parametrize("form", ["nix", "json"])
+def test_mkZephyrEnv_eval_time_budget(large_westlock: dict[str, Path], form: str) -> None:
+    """Test that evaluating the devShell with a large westlock stays within budget."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        stats_path = Path(tmpdir) / "stats.json"
+        result = eval_zephyr_env(
+            f"westlockPath = {large_westlock[form]};",
+            "drvPath",
+            env={**os.environ, "NIX_SHOW_STATS": "1", "NIX_SHOW_STATS_PATH": str(stats_path)},
+        )
+
+        assert result.returncode == 0, f"Eval failed: {result.stderr}"
+
+        import json
+        cpu_time = json.loads(stats_path.read_text())["cpuTime"]
+        assert cpu_time < EVAL_TIME_BUDGET_S, \
+            f"Evaluation with westlock.{form} took {cpu_time:.2f}s, budget is {EVAL_TIME_BUDGET_S}s"
+
+
+def test_westlock_json_matches_nix(large_westlock: dict[str, Path]) -> None:
+    """Test that a JSON westlock yields the same west projects as the Nix form."""
+    drv_paths = {}
+    for form, lock in large_westlock.items():
+        result = eval_zephyr_env(f"westlockPath = {lock};", "passthru.westWorkspaceSetup.drvPath")
+        assert result.returncode == 0, f"Eval with westlock.{form} failed: {result.stderr}"
+        drv_paths[form] = result.stdout
+
+    assert drv_paths["json"] == drv_paths["nix"]
+
+
+def test_westProjectNames_restricts_projects(large_westlock: dict[str, Path]) -> None:
+    """Test that westProjectNames keeps only the listed projects, for both lock forms."""
+    drv_paths = {}
+    for form, lock in large_westlock.items():
+        result = eval_zephyr_env(
+            f'westlockPath = {lock}; westProjectNames = [ "project-00" "project-01" ];',
+            "passthru.westWorkspaceSetup.drvPath",
+        )
+        assert result.returncode == 0, f"Eval with westlock.{form} failed: {result.stderr}"
+        drv_paths[form] = result.stdout
+
+    full = eval_zephyr_env(f"westlockPath = {large_westlock['json']};", "passthru.westWorkspaceSetup.drvPath")
+    assert full.returncode == 0, f"Eval failed: {full.stderr}"
+
+    assert drv_paths["json"] == drv_paths["nix"]
+    assert drv_paths["json"] != full.stdout
+
+    result = eval_zephyr_env(
+        f'westlockPath = {large_westlock["json"]}; westProjectNames = [ "no-such-project" ];',
+        "passthru.westWorkspaceSetup.drvPath",
+    )
+    assert result.returncode != 0
+    assert "no-such-project" in result.stderr
+
+
+def test_westlockPath_relative_string_rejected() -> None:
+    """Test that a relative string westlockPath is rejected instead of resolved against the store."""
+    result = eval_zephyr_env('westlockPath = "westlock.json";', "passthru.westProjects")
+
+    assert result.returncode != 0
+    assert "westlockPath must be a path" in result.stderr
+
+
+def test_westlockPath_absolute_string(large_westlock: dict[str, Path]) -> None:
+    """Test that an absolute string westlockPath works like the same path."""
+    for form, lock in large_westlock.items():
+        from_path = eval_zephyr_env(f"westlockPath = {lock};", "passthru.westWorkspaceSetup.drvPath")
+        from_string = eval_zephyr_env(f'westlockPath = "{lock}";', "passthru.westWorkspaceSetup.drvPath")
+
+        assert from_path.returncode == 0, f"Eval with westlock.{form} failed: {from_path.stderr}"
+        assert from_string.returncode == 0, f"Eval with westlock.{form} string failed: {from_string.stderr}"
+        assert from_string.stdout == from_path.stdout
+
+
 def test_all_lib_functions_present() -> None:
     """Test that all expected lib functions are available."""
     expected_functions = [
         "mkZephyrEnv",
+        "mkZephyrApp",
         "mkZephyrDependencies",
         "mkPythonEnv",
         "mkCrossCCache",
+        "mkBuildMatrix",
         "mkWestProjects",
         "mkWestWorkspace",
         "mkWestProject",
@@ -1,5 +1,6 @@
 """Tests for mkPythonEnv library function."""
 
+import os
 import subprocess
 import tempfile
 from pathlib import Path
@@ -197,3 +198,160 @@ def test_python_version() -> None:
 
         assert result.returncode == 0
         assert "3.11" in result.stdout
+
+
+def test_setup_compiles_hash_based_bytecode() -> None:
+    """Test mkPythonEnv precompiles installed packages with checked-hash .pyc files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace_dir = Path(tmpdir) / "workspace"
+        workspace_dir.mkdir()
+
+        requirements_in = FIXTURES_DIR / "simple" / "requirements.in"
+        pylock_path = workspace_dir / "pylock.toml"
+
+        generate_pylock_toml(requirements_in, pylock_path, python_version="3.12")
+
+        flake_content = f"""
+{{
+  inputs = {{
+    zephyr-nix.url = "path:{REPO_ROOT}";
+    nixpkgs.follows = "zephyr-nix/nixpkgs";
+  }};
+
+  outputs = {{ self, zephyr-nix, nixpkgs }}: {{
+    packages.x86_64-linux.default = zephyr-nix.lib.x86_64-linux.mkPythonEnv {{
+      workspaceRoot = ./.;
+    }};
+  }};
+}}
+"""
+        (workspace_dir / "flake.nix").write_text(flake_content)
+
+        result = subprocess.run(
+            ["nix", "build", ".#default", "--out-link", "result-setup"],
+            cwd=workspace_dir,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+        assert result.returncode == 0
+
+        assert (workspace_dir / "result-setup" / "bin" / "python-import-profile").exists()
+
+        # An existing venv where an import already wrote timestamp-based pycs
+        venv_path = workspace_dir / ".venv"
+        for command in (
+            ["uv", "venv", "--python", "3.12", str(venv_path)],
+            ["uv", "pip", "install", "--python", str(venv_path / "bin" / "python"), "--requirement", str(pylock_path)],
+            [str(venv_path / "bin" / "python"), "-c", "import certifi"],
+        ):
+            result = subprocess.run(command, capture_output=True, text=True, check=False, timeout=120)
+            assert result.returncode == 0, f"{command[0]} failed: {result.stderr}"
+
+        def pyc_flags() -> int:
+            pyc_files = list(venv_path.glob("lib/python*/site-packages/certifi/__pycache__/__init__.*.pyc"))
+            assert pyc_files, "certifi has no bytecode"
+            # PEP 552: flags 0b11 in the .pyc header mark a checked hash-based pyc
+            return int.from_bytes(pyc_files[0].read_bytes()[4:8], "little")
+
+        assert pyc_flags() == 0, "Import did not write a timestamp-based pyc"
+
+        setup_script = workspace_dir / "result-setup" / "bin" / "python-env-setup"
+        result = subprocess.run(
+            [str(setup_script), str(workspace_dir), str(pylock_path)],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=120,
+        )
+
+        assert result.returncode == 0, f"Setup failed: {result.stderr}"
+
+        flags = pyc_flags()
+        assert flags == 0b11, f"Expected checked-hash pyc, got flags {flags:#b}"
+
+
+def test_import_profile_uses_workspace_venv() -> None:
+    """Test python-import-profile runs the venv interpreter and excludes start-up imports."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace_dir = Path(tmpdir) / "workspace"
+        workspace_dir.mkdir()
+
+        requirements_in = FIXTURES_DIR / "simple" / "requirements.in"
+        pylock_path = workspace_dir / "pylock.toml"
+
+        generate_pylock_toml(requirements_in, pylock_path, python_version="3.12")
+
+        flake_content = f"""
+{{
+  inputs = {{
+    zephyr-nix.url = "path:{REPO_ROOT}";
+    nixpkgs.follows = "zephyr-nix/nixpkgs";
+  }};
+
+  outputs = {{ self, zephyr-nix, nixpkgs }}: {{
+    packages.x86_64-linux.default = zephyr-nix.lib.x86_64-linux.mkPythonEnv {{
+      workspaceRoot = ./.;
+    }};
+  }};
+}}
+"""
+        (workspace_dir / "flake.nix").write_text(flake_content)
+
+        result = subprocess.run(
+            ["nix", "build", ".#default", "--out-link", "result-setup"],
+            cwd=workspace_dir,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+        assert result.returncode == 0
+
+        setup_script = workspace_dir / "result-setup" / "bin" / "python-env-setup"
+        result = subprocess.run(
+            [str(setup_script), str(workspace_dir), str(pylock_path)],
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=120,
+        )
+
+        assert result.returncode == 0, f"Setup failed: {result.stderr}"
+
+        profile_script = workspace_dir / "result-setup" / "bin" / "python-import-profile"
+        env = {key: value for key, value in os.environ.items() if key != "VIRTUAL_ENV"}
+
+        # certifi is only installed in the workspace venv
+        result = subprocess.run(
+            [str(profile_script), "--top", "50", "certifi"],
+            capture_output=True,
+            text=True,
+            check=False,
+            env={**env, "VIRTUAL_ENV": str(workspace_dir / ".venv")},
+            timeout=60,
+        )
+
+        assert result.returncode == 0, f"Profile failed: {result.stderr}"
+        assert "Failed" not in result.stderr
+
+        modules, ranking = result.stdout.split("\n\n", 1)
+        assert any(line.split()[0] == "certifi" for line in modules.splitlines()[1:])
+        ranked = [line.split()[0] for line in ranking.splitlines()[1:]]
+        assert "certifi" in ranked
+        assert "encodings" not in ranked
+        assert "site" not in ranked
+
+        # Without an active venv it looks in workspaceRoot, which has none in the store
+        result = subprocess.run(
+            [str(profile_script), "certifi"],
+            capture_output=True,
+            text=True,
+            check=False,
+            env=env,
+            timeout=60,
+        )
+
+        assert result.returncode != 0
+        assert "no Python interpreter" in result.stderr